@@ -1,40 +1,64 @@
 from google.adk.agents.llm_agent import Agent
-from google.adk.agents import SequentialAgent, LlmAgent
+from google.adk.agents import SequentialAgent, LlmAgent, ParallelAgent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.runners import InMemoryRunner
 from google.adk.tools import google_search
 from google.genai import types
 
+NUM_SECTIONS = 3
+
 outline_agent = Agent(
     name="OutlineAgent",
     model="gemini-2.5-flash-lite",
-    instruction="""Create a blog outline for the given topic with:
+    instruction=f"""Create a blog outline for the given topic with:
     1. A catchy headline
     2. An introduction hook
-    3. 3-5 main sections with 2-3 bullet points for each
+    3. Exactly {NUM_SECTIONS} main sections (numbered 1 to {NUM_SECTIONS}) with 2-3 bullet points for each
     4. A concluding thought""",
     output_key="blog_outline", # The result of this agent will be stored in the session state with this key.
 )
 
-writer_agent = Agent(
-    name="WriterAgent",
-    model="gemini-2.5-flash-lite",
-    # The `{blog_outline}` placeholder automatically injects the state value from the previous agent's output.
-    instruction="""Following this outline strictly: {blog_outline}
-    Write a brief, 200 to 300-word blog post with an engaging and informative tone.""",
-    output_key="blog_draft", # The result of this agent will be stored with this key.
+# One writer per outline section. They only depend on `{blog_outline}`, not on each
+# other, so they can run concurrently - total writing time is max(section) instead
+# of sum(sections).
+section_writer_agents = [
+    Agent(
+        name=f"SectionWriterAgent{i}",
+        model="gemini-2.5-flash-lite",
+        # The `{blog_outline}` placeholder automatically injects the state value from the outline agent's output.
+        instruction=f"""Following this outline strictly: {{blog_outline}}
+        Write ONLY main section {i} of the blog post (60 to 100 words) with an engaging and informative tone.
+        Do not write the other sections, the introduction, or the conclusion.""",
+        output_key=f"draft_{i}", # Each writer stores its section under its own key.
+    )
+    for i in range(1, NUM_SECTIONS + 1)
+]
+
+# Fan out: all section writers run in parallel on the shared outline.
+writer_team = ParallelAgent(
+    name="WriterTeam",
+    sub_agents=section_writer_agents,
 )
 
 editor_agent = Agent(
     name="EditorAgent",
     model="gemini-2.5-flash-lite",
-    # This agent receives the `{blog_draft}` from the writer agent's output.
-    instruction="""Edit this draft: {blog_draft}
-    Your task is to polish the text by fixing any grammatical errors, improving the flow and sentence structure, and enhancing overall clarity.""",
+    # This agent receives the `{draft_i}` sections from the parallel writers' output.
+    instruction="""Following this outline strictly: {blog_outline}
+    Combine these section drafts into one brief, 200 to 300-word blog post:
+
+    {draft_1}
+
+    {draft_2}
+
+    {draft_3}
+
+    Add a short introduction and conclusion from the outline, then polish the text by fixing any grammatical errors, improving the flow and sentence structure, and enhancing overall clarity.""",
     output_key="final_blog", # This is the final output of the entire pipeline.
 )
 
+# Outline first, then the parallel writer fan-out, then a single editor pass.
 root_agent = SequentialAgent(
     name="BlogPipeline",
-    sub_agents=[outline_agent, writer_agent, editor_agent],
+    sub_agents=[outline_agent, writer_team, editor_agent],
 )
@@ -26,10 +26,12 @@ def show_python_code_and_result(response):
                     print("Generated Python Response >> ", response_code["result"])
 
 retry_config = types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
+    attempts=6,  # Maximum retry attempts
+    exp_base=2,  # Capped exponential backoff: 1s, 2s, 4s, ... up to max_delay
     initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],  # Retry on these HTTP errors
+    max_delay=30,  # Never stall for minutes waiting out a rate-limit burst
+    jitter=0.5,  # Randomize delays so parallel agents don't retry in lockstep
+    http_status_codes=[429, 500, 502, 503, 504],  # Retry on these HTTP errors
 )
 
 calculation_agent = LlmAgent(
@@ -2,6 +2,7 @@ from google.adk.runners import InMemoryRunner
 import asyncio
 from agent import image_agent
 from dotenv import load_dotenv
+from google.genai import types
 from IPython.display import display, Image as IPImage
 import base64
 
@@ -9,15 +10,29 @@ load_dotenv()
 
 async def main():
     runner = InMemoryRunner(agent=image_agent)
-    response = await runner.run_debug("Provide a sample tiny image", verbose=True)
-    for event in response:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="test_user", session_id="image_display"
+    )
+
+    query = types.Content(
+        role="user", parts=[types.Part(text="Provide a sample tiny image")]
+    )
+
+    # Stream events instead of collecting the full debug response first: each image
+    # is decoded and displayed the moment its part arrives, so the first image
+    # renders before the stream finishes and only one decoded image is held in
+    # memory at a time.
+    async for event in runner.run_async(
+        user_id="test_user", session_id=session.id, new_message=query
+    ):
         if event.content and event.content.parts:
             for part in event.content.parts:
-                if hasattr(part, "function_response") and part.function_response:
+                if part.function_response:
                     for item in part.function_response.response.get("content", []):
                         if item.get("type") == "image":
-                            display(IPImage(data=base64.b64decode(item["data"])))
+                            # decodebytes is marginally faster than b64decode and
+                            # tolerates embedded newlines in the payload
+                            display(IPImage(data=base64.decodebytes(item["data"].encode("ascii"))))
 
 if __name__=="__main__":
     asyncio.run(main())
-
@@ -1,4 +1,20 @@
+import difflib
 import json
+import time
+from pathlib import Path
+
+try:
+    import orjson  # Optional: serializes 2-5x faster than stdlib json
+except ImportError:
+    orjson = None
+
+def _write_json(path, obj):
+    """Serialize to one buffer first, then write it in one go - json.dump with
+    indent streams many tiny write() calls to the file object instead."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        Path(path).write_text(json.dumps(obj, indent=2))
 
 # Create evaluation configuration with basic criteria
 eval_config = {
@@ -8,8 +24,7 @@ eval_config = {
     }
 }
 
-with open("home_automation_agent/test_config.json", "w") as f:
-    json.dump(eval_config, f, indent=2)
+_write_json("home_automation_agent/test_config.json", eval_config)
 
 print("✅ Evaluation configuration created!")
 print("\n📊 Evaluation Criteria:")
@@ -86,8 +101,7 @@ test_cases = {
     ],
 }
 
-with open("home_automation_agent/integration.evalset.json", "w") as f:
-    json.dump(test_cases, f, indent=2)
+_write_json("home_automation_agent/integration.evalset.json", test_cases)
 
 print("✅ Evaluation test cases created")
 print("\n🧪 Test scenarios:")
@@ -95,6 +109,76 @@ for case in test_cases["eval_cases"]:
     user_msg = case["conversation"][0]["user_content"]["parts"][0]["text"]
     print(f"• {case['eval_id']}: {user_msg}")
 
+def run_evalset_batched(
+    evalset_path="home_automation_agent/integration.evalset.json",
+    model="gemini-2.5-flash-lite",
+):
+    """Run all eval cases through Gemini's inline Batch API instead of one-by-one.
+
+    Offline grading is latency-insensitive, so batch mode is a great fit: it's
+    ~50% cheaper than interactive calls and Google parallelizes the requests
+    server-side. Responses are validated locally against the response_match_score
+    criterion (tool trajectories still need the interactive ADK eval runner).
+
+    Args:
+        evalset_path: Path to the .evalset.json file to grade.
+        model: Gemini model to run the cases against.
+
+    Returns:
+        A list of per-case result dicts with the match score and pass/fail.
+    """
+    from google import genai
+
+    with open(evalset_path) as f:
+        evalset = json.load(f)
+    cases = evalset["eval_cases"]
+
+    # One inline request per eval case - the whole set goes out in a single job.
+    inlined_requests = [
+        {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": case["conversation"][0]["user_content"]["parts"],
+                }
+            ]
+        }
+        for case in cases
+    ]
+
+    client = genai.Client()
+    job = client.batches.create(model=model, src={"inlined_requests": inlined_requests})
+    print(f"📦 Batch eval job submitted: {job.name} ({len(cases)} cases)")
+
+    # Poll until the server-side job settles.
+    while job.state.name not in (
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+    ):
+        time.sleep(10)
+        job = client.batches.get(name=job.name)
+
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch eval job ended in state {job.state.name}")
+
+    # Grade the responses locally against the configured criteria.
+    threshold = eval_config["criteria"]["response_match_score"]
+    results = []
+    for case, inlined in zip(cases, job.dest.inlined_responses):
+        expected = case["conversation"][0]["final_response"]["parts"][0]["text"]
+        actual = inlined.response.text if inlined.response else ""
+        score = difflib.SequenceMatcher(None, expected, actual).ratio()
+        results.append(
+            {
+                "eval_id": case["eval_id"],
+                "response_match_score": round(score, 3),
+                "passed": score >= threshold,
+            }
+        )
+        print(f"• {case['eval_id']}: match={score:.2f} {'✅' if score >= threshold else '❌'}")
+    return results
+
 print("\n📊 Expected results:")
 print("• basic_device_control: Should pass both criteria")
 print(
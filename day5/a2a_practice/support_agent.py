@@ -1,9 +1,13 @@
+import itertools
 import json
+import httpx
+import os
 import requests
 import subprocess
 import time
 import uuid
 import asyncio
+from pathlib import Path
 from dotenv import load_dotenv
 
 from google.adk.agents import LlmAgent
@@ -21,22 +25,81 @@ from google.genai import types
 # Hide additional warnings in the notebook
 import warnings
 
+try:
+    import orjson  # Optional: parses ~2x faster than stdlib json with less memory
+except ImportError:
+    orjson = None
+
+def _json_loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
 load_dotenv()
 
 
 retry_config = types.HttpRetryOptions(
-    attempts=5,  # Maximum retry attempts
-    exp_base=7,  # Delay multiplier
+    attempts=6,  # Maximum retry attempts
+    exp_base=2,  # Capped exponential backoff: 1s, 2s, 4s, ... up to max_delay
     initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],  # Retry on these HTTP errors
+    max_delay=30,  # Never stall for minutes waiting out a rate-limit burst
+    jitter=0.5,  # Randomize delays so parallel agents don't retry in lockstep
+    http_status_codes=[429, 500, 502, 503, 504],  # Retry on these HTTP errors
 )
+# One pooled HTTP client for ALL A2A traffic, created once at module scope.
+# Keep-alive connections let every A2A call (and the parallel demos) reuse a warm
+# TCP connection instead of opening a fresh one per request. Enable http2=True as
+# well if the `h2` extra is installed, to multiplex calls over a single connection.
+a2a_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+    timeout=30,
+)
+
+# The agent card URL - this is where the A2A protocol metadata lives
+AGENT_CARD_URL = f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}"
+
+# The card changes rarely, so keep a short-lived copy on disk and skip the HTTP
+# fetch on repeated cold starts (notebook re-runs, eval loops, etc.).
+_AGENT_CARD_CACHE_FILE = Path.home() / ".cache" / "adk" / "agent_cards" / "localhost_8001.json"
+_AGENT_CARD_TTL_SECONDS = 300
+
+def _load_agent_card():
+    """Returns the remote agent card, preferring the on-disk cache.
+
+    Resolution order: fresh cache entry -> fetch from the server (refreshing the
+    cache) -> fall back to the bare URL so RemoteA2aAgent fetches lazily on
+    first use. The cache also means a warm start doesn't need localhost:8001
+    to be up yet.
+    """
+    from a2a.types import AgentCard
+
+    try:
+        if time.time() - _AGENT_CARD_CACHE_FILE.stat().st_mtime < _AGENT_CARD_TTL_SECONDS:
+            return AgentCard.model_validate(_json_loads(_AGENT_CARD_CACHE_FILE.read_bytes()))
+    except (OSError, ValueError):
+        pass  # Missing, stale, or corrupt cache - fall through to a fresh fetch
+
+    try:
+        response = requests.get(AGENT_CARD_URL, timeout=5)
+        response.raise_for_status()
+        card_json = _json_loads(response.content)
+        _AGENT_CARD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _AGENT_CARD_CACHE_FILE.write_bytes(_json_dumps(card_json))
+        return AgentCard.model_validate(card_json)
+    except Exception:
+        # Server isn't reachable yet - hand the URL over and let the proxy resolve it lazily
+        return AGENT_CARD_URL
+
 # Create a RemoteA2aAgent that connects to our Product Catalog Agent
 # This acts as a client-side proxy - the Customer Support Agent can use it like a local agent
 remote_product_catalog_agent = RemoteA2aAgent(
     name="product_catalog_agent",
     description="Remote product catalog agent from external vendor that provides product information.",
-    # Point to the agent card URL - this is where the A2A protocol metadata lives
-    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}",
+    # Resolved from the on-disk cache when possible, saving a fetch per cold start
+    agent_card=_load_agent_card(),
+    # Reuse the shared pooled client for card fetches and agent-to-agent calls
+    httpx_client=a2a_http_client,
 )
 
 print("✅ Remote Product Catalog Agent proxy created!")
@@ -68,6 +131,22 @@ print("   Model: gemini-2.5-flash-lite")
 print("   Sub-agents: 1 (remote Product Catalog Agent via A2A)")
 print("   Ready to help customers!")
 
+# Setup session management (required by ADK).
+# Created ONCE at module scope: a fresh Runner per query would re-initialize the
+# RemoteA2aAgent, re-fetch the remote agent card over HTTP, and open new
+# connections on every call. Each test below still gets its own session ID.
+app_name = "support_app"
+session_service = InMemorySessionService()
+runner = Runner(
+    agent=customer_support_agent, app_name=app_name, session_service=session_service
+)
+
+# Session IDs only need to be unique, not cryptographically random: pay for one
+# urandom read at import (the pid guards against cross-process collisions), then
+# a plain counter per session instead of a uuid4() syscall on every demo.
+_session_prefix = f"{os.getpid()}_{uuid.uuid4().hex[:4]}"
+_session_counter = itertools.count()
+
 async def test_a2a_communication(user_query: str):
     """
     Test the A2A communication between Customer Support Agent and Product Catalog Agent.
@@ -81,61 +160,59 @@ async def test_a2a_communication(user_query: str):
     Args:
         user_query: The question to ask the Customer Support Agent
     """
-    # Setup session management (required by ADK)
-    session_service = InMemorySessionService()
-
     # Session identifiers
-    app_name = "support_app"
     user_id = "demo_user"
     # Use unique session ID for each test to avoid conflicts
-    session_id = f"demo_session_{uuid.uuid4().hex[:8]}"
+    session_id = f"demo_session_{_session_prefix}_{next(_session_counter)}"
 
     # CRITICAL: Create session BEFORE running agent (synchronous, not async!)
-    # This pattern matches the deployment notebook exactly
+    # This pattern matches the deployment notebook exactly.
+    # Only the session is per-test; the Runner and session service are shared.
     session = await session_service.create_session(
         app_name=app_name, user_id=user_id, session_id=session_id
     )
 
-    # Create runner for the Customer Support Agent
-    # The runner manages the agent execution and session state
-    runner = Runner(
-        agent=customer_support_agent, app_name=app_name, session_service=session_service
-    )
-
     # Create the user message
     # This follows the same pattern as the deployment notebook
     test_content = types.Content(parts=[types.Part(text=user_query)])
 
-    # Display query
-    print(f"\n👤 Customer: {user_query}")
-    print(f"\n🎧 Support Agent response:")
-    print("-" * 60)
+    # Buffer this demo's output and flush it in one block at the end, so logs from
+    # concurrently running demos don't interleave.
+    out = []
+    out.append(f"\n👤 Customer: {user_query}")
+    out.append(f"\n🎧 Support Agent response:")
+    out.append("-" * 60)
 
     # Run the agent asynchronously (handles streaming responses and A2A communication)
     async for event in runner.run_async(
         user_id=user_id, session_id=session_id, new_message=test_content
     ):
-        # Print final response only (skip intermediate events)
+        # Keep final response only (skip intermediate events)
         if event.is_final_response() and event.content:
             for part in event.content.parts:
                 if hasattr(part, "text"):
-                    print(part.text)
+                    out.append(part.text)
 
-    print("-" * 60)
+    out.append("-" * 60)
+    print("\n".join(out))
 
 async def main():
-    # Run the test
+    # Run the tests
     print("🧪 Testing A2A Communication...\n")
-    await test_a2a_communication("Can you tell me about the iPhone 15 Pro? Is it in stock?")
-
-    # Test comparing multiple products
-    await test_a2a_communication(
-        "I'm looking for a laptop. Can you compare the Dell XPS 15 and MacBook Pro 14 for me?"
-    )
 
-    # Test specific product inquiry
-    await test_a2a_communication(
-        "Do you have the Sony WH-1000XM5 headphones? What's the price?"
+    # The three demos are independent (each gets its own session), so run them
+    # concurrently - total wall time is the slowest demo instead of the sum.
+    await asyncio.gather(
+        # Basic product inquiry
+        test_a2a_communication("Can you tell me about the iPhone 15 Pro? Is it in stock?"),
+        # Test comparing multiple products
+        test_a2a_communication(
+            "I'm looking for a laptop. Can you compare the Dell XPS 15 and MacBook Pro 14 for me?"
+        ),
+        # Test specific product inquiry
+        test_a2a_communication(
+            "Do you have the Sony WH-1000XM5 headphones? What's the price?"
+        ),
     )
 
 if __name__=="__main__":